@@ -1,15 +1,160 @@
+"""
+The hydrophone class records audio from the hydrophone array.
+"""
+import logging
+import queue
+import threading
 import time
-import os
-import RPi.GPIO as GPIO
-import eeml
-GPIO.setmode(GPIO.BCM)
-DEBUG = 1
-LOGGER = 1
 
-GPIO.setup(0, GPIO.IN)
-input = GPIO.input(0)
+import numpy as np
+import sounddevice as sd
+from scipy.io import wavfile
 
-while True:
-        pass
+# Recording settings
+SAMPLE_RATE = 62000
+CHANNELS = 2
+# Ring buffer length. At 62 kHz, 2 channels and int16 this is 14.9 MB, allocated once per Hydrophone,
+# plus one copy of the recording for each save waiting in the save queue. Fits on a Pi 3 (1 GB).
+MAX_RECORDING_SECONDS = 60
+DEFAULT_BLOCKSIZE = 2048
+SAVE_QUEUE_SIZE = 4  # Recordings waiting to be written before save_recording blocks
 
-time.sleep(1)
+
+logger = logging.getLogger("HYD")
+
+
+class Hydrophone:
+    """
+    Object that records the hydrophone array into a ring buffer using a callback stream.
+    """
+
+    def __init__(self, fs=SAMPLE_RATE, max_seconds=MAX_RECORDING_SECONDS, blocksize=DEFAULT_BLOCKSIZE):
+        """
+        Initializes the hydrophone object.
+
+        fs:          Sample rate of the recording (Hz).
+        max_seconds: Length of the ring buffer (seconds). Older samples are overwritten.
+        blocksize:   Number of frames passed to each stream callback.
+        """
+        self.fs = fs
+        self.max_seconds = max_seconds
+        self.blocksize = blocksize
+        self.stream = None
+
+        # Ring buffer, allocated once and reused by every recording.
+        self._buf = np.empty((fs * max_seconds, CHANNELS), dtype=np.int16)
+        self._w = 0
+        self._wrapped = False
+
+        # Number of recordings saved, keeps default filenames unique.
+        self._rec_counter = 0
+
+        # Recordings are written to disk by a background thread.
+        self._save_queue = queue.Queue(maxsize=SAVE_QUEUE_SIZE)
+        self._writer = threading.Thread(target=self._write_recordings, daemon=True)
+        self._writer.start()
+
+    def _callback(self, indata, frames, time_info, status):
+        """
+        Copies each block delivered by the audio driver into the ring buffer.
+        """
+        if status:
+            logger.warning("%s", status)
+
+        size = len(self._buf)
+        end = self._w + frames
+        if end <= size:
+            self._buf[self._w:end] = indata
+        else:
+            split = size - self._w
+            self._buf[self._w:] = indata[:split]
+            self._buf[:frames - split] = indata[split:]
+
+        if end >= size:
+            self._wrapped = True
+        self._w = end % size
+
+    def start_recording(self):
+        """
+        Starts recording in the background. Returns immediately.
+        """
+        if self.stream is not None:
+            self.end_recording()
+
+        self._w = 0
+        self._wrapped = False
+
+        self.stream = sd.InputStream(samplerate=self.fs, channels=CHANNELS, dtype='int16',
+                                     blocksize=self.blocksize, latency='low', callback=self._callback)
+        self.stream.start()
+        logger.info("Started recording.")
+
+    def end_recording(self):
+        """
+        Stops the current recording.
+        """
+        if self.stream is None:
+            return
+
+        self.stream.stop()
+        self.stream.close()
+        self.stream = None
+        logger.info("Ended recording.")
+
+    def get_most_recent_recording(self):
+        """
+        Returns the recorded samples in chronological order.
+
+        The result is a view of the ring buffer unless the buffer has wrapped around.
+        """
+        if not self._wrapped:
+            return self._buf[:self._w]
+
+        return np.concatenate((self._buf[self._w:], self._buf[:self._w]))
+
+    def save_recording(self, filename=None):
+        """
+        Queues the most recent recording to be written to a wav file. Returns the filename
+        without waiting for the write.
+
+        filename: Path of the wav file. Defaults to the current timestamp (ns) and a counter.
+        """
+        recording = self.get_most_recent_recording()
+        if len(recording) == 0:
+            raise Exception("No recording to save.")
+
+        # Copy views of the ring buffer so the next recording cannot overwrite queued samples.
+        if recording.base is self._buf:
+            recording = recording.copy()
+
+        if filename is None:
+            # time.time_ns() needs Python 3.7; we support 3.5+.
+            filename = "rec_%d_%d.wav" % (int(time.time() * 1e9), self._rec_counter)
+            self._rec_counter += 1
+
+        self._save_queue.put((filename, recording))
+        return filename
+
+    def _write_recordings(self):
+        """
+        Writes queued recordings to disk. Run by the writer thread.
+        """
+        while True:
+            item = self._save_queue.get()
+            if item is None:  # Sentinel put by close()
+                break
+
+            filename, recording = item
+            try:
+                wavfile.write(filename, self.fs, recording)
+                logger.info("Saved recording to %s", filename)
+            except Exception as e:
+                logger.error("Failed to save recording to %s: %s", filename, e)
+
+    def close(self):
+        """
+        Ends any recording and waits until every queued recording has been written to disk.
+        """
+        self.end_recording()
+        self._save_queue.put(None)
+        self._writer.join()
@@ -3,6 +3,7 @@ The motor_controller class calibrates and sets the speed of all of the motors
 """
 
 # System imports
+import logging
 import time
 
 # Custom Imports
@@ -34,9 +35,7 @@ MAX_PITCH = 30
 MAX_CORRECTION_MOTOR_SPEED = 25  # Max turning speed during pid correction
 
 
-def log(val):
-    """ Adapt log to note the object we are in """
-    print("[MC]\t" + val)
+logger = logging.getLogger("MC")
 
 
 class MotorController:
@@ -72,7 +71,7 @@ class MotorController:
         Sets motor speeds to each individual motor. This is for manual (xbox) control when the
         radio sends a data packet of size 4.
 
-        data: String read from the serial connection containing motor speed values.
+        data: Sequence (list or tuple) of the 4 motor speed values.
         """
         if len(data) != len(self.motors):
             raise Exception(
@@ -80,12 +79,12 @@ class MotorController:
             return
 
         # Parse motor speed from data object.
-        self.left_speed = data[FORWARD_MOTOR_INDEX]
-        self.right_speed = data[TURN_MOTOR_INDEX]
+        self.forward_speed = data[FORWARD_MOTOR_INDEX]
+        self.turn_speed = data[TURN_MOTOR_INDEX]
         self.front_speed = data[FRONT_MOTOR_INDEX]
         self.back_speed = data[BACK_MOTOR_INDEX]
 
-        log("motors is: " + str(data))
+        logger.debug("motors is: %s", data)
 
         # Set motor speed
         self.motors[FORWARD_MOTOR_INDEX].set_speed(self.forward_speed)
@@ -162,25 +161,25 @@ class MotorController:
         """
         Calibrates each individual motor.
         """
-        log('Testing all motors...')
+        logger.info('Testing all motors...')
         for motor in self.motors:
             motor.test_motor()
             time.sleep(1)
 
     def test_forward(self):  # Used to be left motor
-        log('Testing forward motor...')
+        logger.info('Testing forward motor...')
         self.motors[FORWARD_MOTOR_INDEX].test_motor()
 
     def test_turn(self):  # used to be right motor
-        log('Testing turn motor...')
+        logger.info('Testing turn motor...')
         self.motors[TURN_MOTOR_INDEX].test_motor()
 
     def test_front(self):
-        log('Testing front motor...')
+        logger.info('Testing front motor...')
         self.motors[FRONT_MOTOR_INDEX].test_motor()
 
     def test_back(self):
-        log('Testing back motor...')
+        logger.info('Testing back motor...')
         self.motors[BACK_MOTOR_INDEX].test_motor()
 
     def check_gpio_pins(self):
@@ -188,7 +187,7 @@ class MotorController:
         io.setmode(io.BOARD)
         for pins in self.pi_pins:
             io.setup(pins, io.IN)
-            log("Pin:", pins, io.input(pins))
+            logger.info("Pin: %s %s", pins, io.input(pins))
 
     def calculate_pid_new_speed(self, feedback):
         # Case 1: Going backward
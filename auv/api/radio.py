@@ -1,26 +1,35 @@
 """
 The radio class enables communication over wireless serial radios.
 """
+import io
 import serial
 import os
+import selectors
+import threading
 TIMEOUT_DURATION = 2
 DEFAULT_BAUDRATE = 115200
+MAX_LINE_LENGTH = 1024  # Longer partial lines are radio noise and are dropped
 
 
 class Radio:
-    def __init__(self, serial_path, baudrate=DEFAULT_BAUDRATE):
+    def __init__(self, serial_path, baudrate=DEFAULT_BAUDRATE, timeout=TIMEOUT_DURATION):
         """
         Initializes the radio object.
 
         serial_path: Absolute path to serial port for specified device.
+        timeout:     Seconds a read blocks waiting for data.
         """
 
         # Establish connection to the serial radio.
         self.ser = serial.Serial(serial_path,
                                  baudrate=baudrate, parity=serial.PARITY_NONE,
                                  stopbits=serial.STOPBITS_ONE, bytesize=serial.EIGHTBITS,
-                                 timeout=TIMEOUT_DURATION
+                                 timeout=timeout
                                  )
+        self.lock = threading.Lock()  # Keeps close() from freeing the fd during write_frame()
+        self.rx_buffer = bytearray()  # Received bytes not yet returned as a line
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.ser, selectors.EVENT_READ)
 
     def write(self, message):
         """
@@ -30,6 +39,26 @@ class Radio:
         """
         self.ser.write(message)
 
+    def write_frame(self, frame):
+        """
+        Sends a small, already encoded frame straight to the serial file descriptor.
+        Falls back to the serial connection for anything the descriptor did not take.
+
+        frame: Bytes sent over serial connection.
+        """
+        with self.lock:
+            # Look up the fd every call; once closed, its number may belong to another file.
+            if not self.ser.is_open:
+                raise serial.SerialException("Attempting to use a port that is not open")
+
+            try:
+                written = os.write(self.ser.fd, frame)
+            except BlockingIOError:
+                written = 0
+
+            if written < len(frame):
+                self.ser.write(frame[written:])
+
     def readlines(self):
         """
         Returns a list of lines from buffer.
@@ -42,6 +71,34 @@ class Radio:
         """
         return self.ser.readline()
 
+    def wait_readable(self, timeout):
+        """
+        Blocks until data is waiting on the serial connection or the timeout passes.
+        Returns True if data is waiting.
+
+        timeout: Longest time to wait (seconds).
+        """
+        return len(self.selector.select(max(0, timeout))) > 0
+
+    def drain_lines(self):
+        """
+        Returns a list of complete lines received, waiting up to the timeout for new data.
+        Reads everything waiting in one call instead of one byte at a time like readline.
+        """
+        self.rx_buffer += self.ser.read(max(1, self.ser.in_waiting))
+
+        end = self.rx_buffer.rfind(b'\n') + 1
+        lines = []
+        if end > 0:
+            # Copy the complete lines once; readlines splits on '\n' only, like readline.
+            lines = io.BytesIO(bytes(memoryview(self.rx_buffer)[:end])).readlines()
+            del self.rx_buffer[:end]
+
+        # Noise without a newline would otherwise grow the buffer forever.
+        if len(self.rx_buffer) > MAX_LINE_LENGTH:
+            del self.rx_buffer[:]
+        return lines
+
     def is_open(self):
         """
         Returns a boolean if the serial connection is open.
@@ -58,4 +115,6 @@ class Radio:
         """
         Closes the serial connection
         """
-        self.ser.close()
+        with self.lock:
+            self.selector.close()
+            self.ser.close()
@@ -3,28 +3,39 @@ This class acts as the main functionality file for
 the Nautilus AUV. The "mind and brain" of the mission.
 '''
 # System imports
+import ast
+import logging
 import os
+import signal
 import sys
 import threading
 import time
+from queue import Queue
 
 # Custom imports
 from api import Radio
 from api import IMU
 from api import PressureSensor
 from api import MotorController
-from missions import *
 
 # Constants for the AUV
 RADIO_PATH = '/dev/serial/by-id/usb-Silicon_Labs_CP2102_USB_to_UART_Bridge_Controller_0001-if00-port0'
 IMU_PATH = '/dev/serial0'
 PING = b'PING\n'
-THREAD_SLEEP_DELAY = 0.05
+RADIO_TIMEOUT = 0.5  # Serial read timeout, and time between radio reconnect attempts
+PING_DELAY = 1  # Time between connection pings sent to the BS
+MISSION_LOOP_DELAY = 0.05  # Time between runs of the current mission's loop
 CONNECTION_TIMEOUT = 3
 
 
-def log(val):
-    print("[AUV]\t" + val)
+logger = logging.getLogger("AUV")
+
+
+def parse_args(args):
+    """ Parses the argument list of a command into a tuple, e.g. '0, "ALL"' -> (0, 'ALL') """
+    if args.strip() == "":
+        return ()
+    return ast.literal_eval("(" + args + ",)")
 
 
 class AUV():
@@ -35,33 +46,41 @@ class AUV():
         self.radio = None
         self.pressure_sensor = None
         self.imu = None
+        self.hydrophone = None  # Created on first use, then reused by every mission
         self.mc = MotorController()
         self.connected_to_bs = False
         self.time_since_last_ping = 0.0
         self.current_mission = None
-
-        # Get all non-default callable methods in this class
-        self.methods = [m for m in dir(AUV) if not m.startswith('__')]
+        self._Mission1 = None  # Imported on first use by start_mission
+        self._stop = threading.Event()  # Set to end the main loop
+        self.radio_tx_queue = Queue()  # Outgoing packets, written by AUV_Radio_Writer
 
         try:
             self.pressure_sensor = PressureSensor()
-            log("Pressure sensor has been found")
+            logger.info("Pressure sensor has been found")
         except:
-            log("Pressure sensor is not connected to the AUV.")
+            logger.info("Pressure sensor is not connected to the AUV.")
 
         try:
             self.imu = IMU(IMU_PATH)
-            log("IMU has been found.")
+            logger.info("IMU has been found.")
         except:
-            log("IMU is not connected to the AUV on IMU_PATH.")
+            logger.info("IMU is not connected to the AUV on IMU_PATH.")
 
         try:
-            self.radio = Radio(RADIO_PATH)
-            log("Radio device has been found.")
+            self.radio = Radio(RADIO_PATH, timeout=RADIO_TIMEOUT)
+            logger.info("Radio device has been found.")
         except:
-            log("Radio device is not connected to AUV on RADIO_PATH.")
+            logger.info("Radio device is not connected to AUV on RADIO_PATH.")
+
+        self.radio_writer = AUV_Radio_Writer(self)
+        self.radio_writer.start()
 
-        self.main_loop()
+        # End the main loop (and our threads) cleanly on Ctrl+C or kill.
+        signal.signal(signal.SIGINT, lambda signum, frame: self._stop.set())
+        signal.signal(signal.SIGTERM, lambda signum, frame: self._stop.set())
+
+        self._main_loop()
 
     def xbox(self, data):
         self.mc.update_motor_speeds(data)
@@ -82,129 +101,179 @@ class AUV():
         else:
             raise Exception('No implementation for motor name: ', motor)
 
-    def main_loop(self):
+    def _main_loop(self):
         """ Main connection loop for the AUV. """
 
-        log("Starting main connection loop.")
-        while True:
+        # Bind globals used on every pass to locals (LOAD_FAST instead of LOAD_GLOBAL).
+        monotonic = time.monotonic
+        ping = PING
+        connection_timeout = CONNECTION_TIMEOUT
+        next_ping = monotonic()
+        next_mission = monotonic()
 
-            # Always try to update connection status.
-            if time.time() - self.time_since_last_ping > CONNECTION_TIMEOUT:
-                # Line read was EMPTY, but 'before' connection status was successful? Connection verification failed.
-                if self.connected_to_bs is True:
-                    log("Lost connection to BS.")
-
-                    # reset motor speed to 0 immediately
-                    self.mc.update_motor_speeds([0, 0, 0, 0])
-                    log("DEBUG TODO speeds reset")
-
-                    self.connected_to_bs = False
-
-            if self.radio is None or self.radio.is_open() is False:
-                try:  # Try to connect to our devices.
-                    self.radio = Radio(RADIO_PATH)
-                    log("Radio device has been found!")
-                except:
-                    pass
-            else:
-                try:
-                    # Always send a connection verification packet and attempt to read one.
-                    # self.radio.write(AUV_PING)
-                    self.radio.write(PING)
-
-                    if self.connected_to_bs is True:  # Send our AUV packet as well.
-
-                        # TODO Data sending logic
-                        #
-                        # if (sending_data):
-                        #    if(data.read(500000) != EOF)
-                        #        send("d("+data.nextBytes+")")
-                        #    else:
-                        #        send("d_done()")
-                        #        sending_data = False
-
-                        if self.imu is not None:
-                            try:
-                                heading = self.imu.quaternion[0]
-                                if heading is not None:
-                                    heading = round(
-                                        abs(heading * 360) * 100.0) / 100.0
-
-                                    temperature = self.imu.temperature
-                                    # (Heading, Temperature)
-                                    if temperature is not None:
-                                        self.radio.write(str.encode(
-                                            "auv_data(" + str(heading) + ", " + str(temperature) + ")\n"))
-                            except:
-                                pass
-
-                    # Read ALL lines stored in buffer (probably around 2-3 commands)
-                    lines = self.radio.readlines()
-                    self.radio.flush()
-
-                    for line in lines:
-                        if line == PING:  # We have a ping!
-                            self.time_since_last_ping = time.time()
-                            if self.connected_to_bs is False:
-                                log("Connection to BS verified.")
-                                self.connected_to_bs = True
-
-                                # TODO test case: set motor speeds
-                                data = [1, 2, 3, 4]
-                                self.xbox(data)
-
-                        elif len(line) > 1:
-                            # Line was read, but it was not equal to a BS_PING
-                            log(
-                                "Possible command found. Line read was: " + str(line))
-
-                            # Decode into a normal utd-8 encoded string and delete newline character
-                            message = line.decode('utf-8').replace("\n", "")
-
-                            if len(message) > 2 and "(" in message and ")" in message:
-                                # Get possible function name
-                                possible_func_name = message[0:message.find(
-                                    "(")]
-
-                                if possible_func_name in self.methods:
-                                    log(
-                                        "Recieved command from base station: " + message)
-                                    self.time_since_last_ping = time.time()
+        logger.info("Starting main connection loop.")
+        try:
+            while not self._stop.is_set():
+
+                # Always try to update connection status.
+                if monotonic() - self.time_since_last_ping > connection_timeout:
+                    # Line read was EMPTY, but 'before' connection status was successful? Connection verification failed.
+                    if self.connected_to_bs is True:
+                        logger.info("Lost connection to BS.")
+
+                        # reset motor speed to 0 immediately
+                        self.mc.update_motor_speeds((0, 0, 0, 0))
+
+                        self.connected_to_bs = False
+
+                if self.radio is None or self.radio.is_open() is False:
+                    try:  # Try to connect to our devices.
+                        self.radio = Radio(RADIO_PATH, timeout=RADIO_TIMEOUT)
+                        logger.info("Radio device has been found!")
+                    except:
+                        # Wait to retry, waking up in time to run the mission's loop.
+                        timeout = RADIO_TIMEOUT
+                        if self.current_mission is not None:
+                            timeout = min(timeout, next_mission - monotonic())
+                        if self._stop.wait(max(0, timeout)):
+                            break
+                else:
+                    try:
+                        if monotonic() >= next_ping:
+                            self._send_ping()
+                            next_ping = monotonic() + PING_DELAY
+
+                        # Sleep until the radio has data, the next ping is due or the mission's loop needs to run.
+                        timeout = next_ping - monotonic()
+                        if self.current_mission is not None:
+                            timeout = min(timeout, next_mission - monotonic())
+
+                        if self.radio.wait_readable(timeout):
+                            lines = self.radio.drain_lines()
+                        else:
+                            lines = []
+
+                        for line in lines:
+                            if line == ping:  # We have a ping!
+                                self.time_since_last_ping = monotonic()
+                                if self.connected_to_bs is False:
+                                    logger.info("Connection to BS verified.")
                                     self.connected_to_bs = True
 
-                                    try:  # Attempt to evaluate command.
-                                        # Append "self." to all commands.
-                                        eval('self.' + message)
-                                        self.radio.write(str.encode(
-                                            "log(\"[AUV]\tSuccessfully evaluated command: " + possible_func_name + "()\")\n"))
-                                    except Exception as e:
-                                        # log error message
-                                        log(str(e))
-                                        # Send verification of command back to base station.
-                                        self.radio.write(str.encode("log(\"[AUV]\tEvaluation of command " +
-                                                                    possible_func_name + "() failed.\")\n"))
-
-                except Exception as e:
-                    log("Error: " + str(e))
-                    self.radio.close()
-                    self.radio = None
-                    log("Radio is disconnected from pi!")
-                    continue
-
-            if(self.current_mission is not None):
-                self.current_mission.loop()
-
-            time.sleep(THREAD_SLEEP_DELAY)
+                                    # TODO test case: set motor speeds
+                                    data = (1, 2, 3, 4)
+                                    self.xbox(data)
+
+                            elif len(line) > 1:
+                                # Line was read, but it was not equal to a BS_PING
+                                logger.debug("Possible command found. Line read was: %s", line)
+
+                                # Decode into a normal utd-8 encoded string and delete newline character
+                                message = line.decode('utf-8').replace("\n", "")
+
+                                if len(message) > 2 and "(" in message and ")" in message:
+                                    # Split into possible function name and its arguments
+                                    possible_func_name, _, args = message.partition("(")
+                                    args = args[:args.rfind(")")]
+
+                                    if possible_func_name in AUV._METHODS:
+                                        logger.info("Recieved command from base station: %s", message)
+                                        self.time_since_last_ping = monotonic()
+                                        self.connected_to_bs = True
+
+                                        try:  # Attempt to evaluate command.
+                                            # Look up the method directly instead of compiling the message with eval.
+                                            getattr(self, possible_func_name)(*parse_args(args))
+                                            self.radio_tx_queue.put(str.encode(
+                                                "log(\"[AUV]\tSuccessfully evaluated command: " + possible_func_name + "()\")\n"))
+                                        except Exception as e:
+                                            # log error message
+                                            logger.error("%s", e)
+                                            # Send verification of command back to base station.
+                                            self.radio_tx_queue.put(str.encode("log(\"[AUV]\tEvaluation of command " +
+                                                                               possible_func_name + "() failed.\")\n"))
+
+                    except Exception as e:
+                        logger.error("Error: %s", e)
+                        self.radio.close()
+                        self.radio = None
+                        logger.info("Radio is disconnected from pi!")
+                        continue
+
+                if self.current_mission is not None and monotonic() >= next_mission:
+                    try:
+                        self.current_mission.loop()
+                    except Exception as e:
+                        # e.g. no hydrophone input device; keep the AUV running.
+                        logger.error("Mission failed: %s", e)
+                        self.abort_mission()
+                    next_mission = monotonic() + MISSION_LOOP_DELAY
+        finally:
+            self._shutdown()
+
+    def _shutdown(self):
+        """ Leaves the AUV safe and stops our threads, however the main loop ended. """
+        # pigpio keeps driving the motors after we exit.
+        self.current_mission = None
+        self.mc.update_motor_speeds((0, 0, 0, 0))
+        if self.hydrophone is not None:
+            self.hydrophone.close()  # Also finishes writing queued recordings
+
+        self.radio_writer.stop()
+        self.radio_writer.join()
+        logger.info("Stopped main connection loop.")
+
+    def _send_ping(self):
+        """ Sends the connection ping, and our AUV data once connected to the BS. """
+
+        # Always send a connection verification packet.
+        self.radio_tx_queue.put(PING)
+
+        if self.connected_to_bs is True:  # Send our AUV packet as well.
+
+            # TODO Data sending logic
+            #
+            # if (sending_data):
+            #    if(data.read(500000) != EOF)
+            #        send("d("+data.nextBytes+")")
+            #    else:
+            #        send("d_done()")
+            #        sending_data = False
+
+            self._send_data()
+
+    def _send_data(self):
+        """ Sends the heading and temperature read from the IMU. """
+        if self.imu is None:
+            return
+
+        try:
+            heading = self.imu.quaternion[0]
+            if heading is not None:
+                heading = round(abs(heading * 360), 2)
+
+                temperature = self.imu.temperature
+                # (Heading, Temperature)
+                if temperature is not None:
+                    self.radio_tx_queue.put(("auv_data(%s, %s)\n" % (heading, temperature)).encode())
+        except:
+            pass
 
     def start_mission(self, mission):
         """ Method that uses the mission selected and begin that mission """
         if(mission == 0):  # Echo-location.
             try:  # Try to start mission
-                self.current_mission = Mission1(
+                if self._Mission1 is None:
+                    from missions import Mission1
+                    self._Mission1 = Mission1
+                if self.hydrophone is None:
+                    from api.hydrophone import Hydrophone
+                    self.hydrophone = Hydrophone()
+                self.current_mission = self._Mission1(
                     self, self.mc, self.imu, self.pressure_sensor)
-                log("Successfully started mission " + str(mission) + ".")
-                self.radio.write(str.encode("mission_started("+str(mission)+")\n"))
-            except:
+                logger.info("Successfully started mission %s.", mission)
+                self.radio_tx_queue.put(str.encode("mission_started("+str(mission)+")\n"))
+            except Exception as e:
                 raise Exception("Mission " + str(mission) +
                                 " failed to start. Error: " + str(e))
         # elif(mission == 2):
@@ -218,13 +287,58 @@ class AUV():
         pass
 
     def abort_mission(self):
+        """ Ends the current mission, stopping the motors and any hydrophone recording. """
         self.current_mission = None
-        log("Successfully aborted the current mission.")
-        self.radio.write(str.encode("mission_failed()\n"))
+        self.mc.update_motor_speeds((0, 0, 0, 0))
+        if self.hydrophone is not None:
+            self.hydrophone.end_recording()
+        logger.info("Successfully aborted the current mission.")
+        self.radio_tx_queue.put(str.encode("mission_failed()\n"))
+
+
+# Get all public callable methods in the AUV class once, for command lookups.
+AUV._METHODS = frozenset(m for m, attr in vars(AUV).items()
+                         if not m.startswith('_') and callable(attr))
+
+
+class AUV_Radio_Writer(threading.Thread):
+    """ Thread that owns all writes to the radio, sending each packet put on the AUV's radio_tx_queue. """
+
+    def __init__(self, auv):
+        """ Constructor for the radio writer thread """
+        threading.Thread.__init__(self, daemon=True)
+        self.auv = auv
+
+    def run(self):
+        """ Blocks on the queue and writes packets until stopped. """
+        while True:
+            packet = self.auv.radio_tx_queue.get()
+            if packet is None:  # Sentinel put by stop()
+                break
+
+            radio = self.auv.radio
+            if radio is None:
+                continue  # Drop packets while the radio is disconnected.
+
+            try:
+                radio.write_frame(packet)
+            except:
+                pass  # The main loop handles radio disconnects.
+
+    def stop(self):
+        """ Stops the radio writer thread once queued packets are written. """
+        self.auv.radio_tx_queue.put(None)
 
 
 def main():
     """ Main function that is run upon execution of auv.py """
+    # Log as "[AUV]\tmessage"; set AUV_LOG_LEVEL=DEBUG for verbose output.
+    level_name = os.environ.get("AUV_LOG_LEVEL", "INFO").upper()
+    level = logging.getLevelName(level_name)  # Unknown names give back a string, not a level
+    logging.basicConfig(format="[%(name)s]\t%(message)s",
+                        level=level if isinstance(level, int) else logging.INFO)
+    if not isinstance(level, int):
+        logger.warning("Unknown AUV_LOG_LEVEL %s, using INFO.", level_name)
     auv = AUV()
 
 
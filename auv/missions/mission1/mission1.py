@@ -11,6 +11,7 @@ class Mission1():
         self.motor_controller = motor_controller
         self.pressure_sensor = pressure_sensor
         self.IMU = IMU
+        self.hydrophone = auv.hydrophone
 
         # Assign our state to starting state.
         self.state = "START"
@@ -20,7 +21,7 @@ class Mission1():
         if self.state == "START":
             if self.motor_controller is not None and self.pressure_sensor is not None and self.IMU is not None:
                 # Begin our mission (start diving)
-                self.motor_controller.update_motor_speeds([0, 0, 50, 50])
+                self.motor_controller.update_motor_speeds((0, 0, 50, 50))
                 self.state = "DIVING"
 
         if self.state == "DIVING":
@@ -30,7 +31,7 @@ class Mission1():
             # If we reached max depth
             if depth >= MAX_DEPTH_METERS:
                 # Turn off our motors
-                self.motor_controller.update_motor_speeds([0, 0, 0, 0])
+                self.motor_controller.update_motor_speeds((0, 0, 0, 0))
 
                 # Set state to rising
                 self.state = "RISING"
@@ -44,4 +45,5 @@ class Mission1():
 
             if depth <= NEAR_SURFACE_METERS:
                 self.hydrophone.end_recording()
+                self.hydrophone.save_recording()
                 self.state = "DONE"
@@ -0,0 +1,33 @@
+# Shared helpers for the AUV tests.
+# Modules are loaded straight from their files so that the hardware libraries
+# pulled in by api/__init__.py (pigpio, RPi.GPIO, adafruit_bno055, ...) are not needed.
+
+import importlib.util
+import os
+import sys
+import types
+
+import pytest
+
+AUV_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_module(name, relative_path):
+    """ Loads the module at auv/relative_path under the given name. """
+    spec = importlib.util.spec_from_file_location(
+        name, os.path.join(AUV_DIR, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def stub_module(monkeypatch):
+    """ Returns a function that replaces a module in sys.modules with an empty stub for this test. """
+    def stub(name, **attributes):
+        module = types.ModuleType(name)
+        for key, value in attributes.items():
+            setattr(module, key, value)
+        monkeypatch.setitem(sys.modules, name, module)
+        return module
+    return stub
@@ -0,0 +1,143 @@
+# AUV main loop tests (the hardware api, missions and hydrophone are stubbed)
+
+import signal
+import types
+
+import pytest
+
+from conftest import load_module
+
+
+class Missing:
+    """ Hardware that is not connected to the AUV. """
+
+    def __init__(self, *args):
+        raise IOError("Device not connected.")
+
+
+class FakeMotorController:
+    def __init__(self):
+        self.speeds = (0, 0, 0, 0)
+
+    def update_motor_speeds(self, data):
+        self.speeds = tuple(data)
+
+
+class FakeHydrophone:
+    def __init__(self):
+        self.recording = False
+        self.closed = False
+
+    def start_recording(self):
+        self.recording = True
+
+    def end_recording(self):
+        self.recording = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeMission:
+    """ Mission1 stand-in that counts how often the main loop ran it. """
+
+    def __init__(self, auv, motor_controller, imu, pressure_sensor):
+        self.auv = auv
+        self.loops = 0
+
+    def loop(self):
+        self.loops += 1
+
+
+class FailingMission(FakeMission):
+    """ Mission whose hydrophone fails at depth, after the dive motors have been started. """
+
+    def loop(self):
+        self.auv.mc.update_motor_speeds((0, 0, 50, 50))
+        self.auv.hydrophone.start_recording()
+        raise RuntimeError("Error querying device -1")
+
+
+class InterruptedMission(FakeMission):
+    def loop(self):
+        raise KeyboardInterrupt  # Not an Exception, so the main loop does not handle it
+
+
+@pytest.fixture
+def bench(stub_module, monkeypatch):
+    """
+    Runs an AUV on stubbed hardware. Its radio delivers bench.received, then the AUV is
+    sent SIGTERM once there is nothing left to read. Missions started are kept in bench.missions.
+    """
+    bench = types.SimpleNamespace(received=[], sent=[], missions=[])
+    handlers = {}
+    monkeypatch.setattr(signal, "signal", lambda signum, handler: handlers.__setitem__(signum, handler))
+
+    class FakeRadio:
+        def __init__(self, serial_path, timeout):
+            pass
+
+        def is_open(self):
+            return True
+
+        def wait_readable(self, timeout):
+            if not bench.received:
+                handlers[signal.SIGTERM](signal.SIGTERM, None)
+            return len(bench.received) > 0
+
+        def drain_lines(self):
+            lines = bench.received[:]
+            del bench.received[:]
+            return lines
+
+        def write_frame(self, frame):
+            bench.sent.append(frame)
+
+        def close(self):
+            pass
+
+    stub_module("api", Radio=FakeRadio, IMU=Missing, PressureSensor=Missing,
+                MotorController=FakeMotorController)
+    stub_module("api.hydrophone", Hydrophone=FakeHydrophone)
+
+    def run(mission_class, lines):
+        def start(*args):
+            bench.missions.append(mission_class(*args))
+            return bench.missions[-1]
+
+        bench.received.extend(lines)
+        stub_module("missions", Mission1=start)
+        load_module("auv", "auv.py").AUV()
+    bench.run = run
+    return bench
+
+
+def assert_shut_down(auv):
+    assert auv.current_mission is None
+    assert auv.mc.speeds == (0, 0, 0, 0)
+    assert auv.hydrophone.closed
+    assert not auv.radio_writer.is_alive()
+
+
+def test_sigterm_shuts_the_auv_down(bench):
+    bench.run(FakeMission, [b'PING\n', b'start_mission(0)\n'])
+
+    mission = bench.missions[0]
+    assert mission.loops > 0
+    assert_shut_down(mission.auv)
+
+
+def test_mission_error_aborts_the_mission(bench):
+    bench.run(FailingMission, [b'PING\n', b'start_mission(0)\n'])
+
+    auv = bench.missions[0].auv
+    assert b'mission_failed()\n' in bench.sent
+    assert not auv.hydrophone.recording
+    assert_shut_down(auv)
+
+
+def test_unhandled_error_still_shuts_the_auv_down(bench):
+    with pytest.raises(KeyboardInterrupt):
+        bench.run(InterruptedMission, [b'PING\n', b'start_mission(0)\n'])
+
+    assert_shut_down(bench.missions[0].auv)
@@ -0,0 +1,91 @@
+# Hydrophone ring buffer tests (sounddevice is stubbed, no audio device needed)
+
+import pytest
+
+from conftest import load_module
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy.io.wavfile")
+
+
+@pytest.fixture
+def written():
+    """ Recordings passed to wavfile.write, as (filename, samples) pairs. """
+    return []
+
+
+@pytest.fixture
+def hydrophone(stub_module, written):
+    """ Hydrophone with a 10 frame ring buffer (fs=5, max_seconds=2) that records wav writes instead of saving. """
+    stub_module("sounddevice")
+    module = load_module("hydrophone", "api/hydrophone.py")
+    module.wavfile = type("wavfile", (), {"write": staticmethod(
+        lambda filename, fs, samples: written.append((filename, samples)))})
+    hyd = module.Hydrophone(fs=5, max_seconds=2, blocksize=4)
+    yield hyd
+    hyd.close()
+
+
+def block(start, frames):
+    """ Returns a (frames, 2) int16 block counting up from start. """
+    samples = np.arange(start, start + frames, dtype=np.int16)
+    return np.stack((samples, -samples), axis=1)
+
+
+def feed(hyd, start, frames):
+    hyd._callback(block(start, frames), frames, None, None)
+
+
+def test_recording_before_wrap_is_a_view(hydrophone):
+    feed(hydrophone, 0, 4)
+    feed(hydrophone, 4, 4)
+
+    recording = hydrophone.get_most_recent_recording()
+    assert recording.base is hydrophone._buf
+    assert np.array_equal(recording, block(0, 8))
+
+
+def test_block_filling_buffer_exactly_wraps(hydrophone):
+    feed(hydrophone, 0, 4)
+    feed(hydrophone, 4, 6)
+
+    assert hydrophone._w == 0
+    assert np.array_equal(hydrophone.get_most_recent_recording(), block(0, 10))
+
+
+def test_wraparound_keeps_newest_samples_in_order(hydrophone):
+    for start in range(0, 16, 4):  # 16 frames into a 10 frame ring
+        feed(hydrophone, start, 4)
+
+    assert hydrophone._w == 6
+    assert np.array_equal(hydrophone.get_most_recent_recording(), block(6, 10))
+
+
+def test_save_recording_copies_views_of_the_ring(hydrophone, written):
+    feed(hydrophone, 0, 4)
+
+    hydrophone.save_recording("test.wav")
+    hydrophone._w = 0
+    feed(hydrophone, 100, 4)  # The next recording overwrites the ring
+    hydrophone.close()  # Wait for the writer thread
+
+    filename, recording = written[0]
+    assert filename == "test.wav"
+    assert recording.base is not hydrophone._buf
+    assert np.array_equal(recording, block(0, 4))
+
+
+def test_save_recording_default_filenames_are_unique(hydrophone, written):
+    feed(hydrophone, 0, 4)
+
+    first = hydrophone.save_recording()
+    second = hydrophone.save_recording()
+    hydrophone.close()
+
+    assert first != second
+    assert [filename for filename, _ in written] == [first, second]
+
+
+def test_save_recording_without_samples_raises(hydrophone):
+    with pytest.raises(Exception):
+        hydrophone.save_recording()
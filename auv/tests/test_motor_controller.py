@@ -0,0 +1,34 @@
+# Motor controller tests (pigpio, RPi.GPIO and the motors are stubbed)
+
+import pytest
+
+from conftest import load_module
+
+
+class FakeMotor:
+    def __init__(self, gpio_pin, pi):
+        self.speed = None
+
+    def set_speed(self, speed):
+        self.speed = speed
+
+
+@pytest.fixture
+def mc(stub_module):
+    stub_module("RPi", GPIO=stub_module("RPi.GPIO"))
+    stub_module("pigpio", pi=lambda: None)
+    stub_module("api", Motor=FakeMotor)
+    return load_module("motor_controller", "api/motor_controller.py").MotorController()
+
+
+def test_update_motor_speeds_sets_every_motor(mc):
+    mc.update_motor_speeds((1, 2, 3, 4))
+    assert [motor.speed for motor in mc.motors] == [1, 2, 3, 4]
+
+    mc.update_motor_speeds((0, 0, 0, 0))
+    assert [motor.speed for motor in mc.motors] == [0, 0, 0, 0]
+
+
+def test_update_motor_speeds_rejects_wrong_length(mc):
+    with pytest.raises(Exception):
+        mc.update_motor_speeds((1, 2, 3))
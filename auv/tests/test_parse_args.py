@@ -0,0 +1,31 @@
+# Radio command argument parsing tests (the hardware api is stubbed)
+
+import pytest
+
+from conftest import load_module
+
+
+@pytest.fixture
+def parse_args(stub_module):
+    stub_module("api", Radio=None, IMU=None, PressureSensor=None, MotorController=None)
+    return load_module("auv", "auv.py").parse_args
+
+
+def test_no_args(parse_args):
+    assert parse_args("") == ()
+    assert parse_args("  ") == ()
+
+
+def test_single_arg(parse_args):
+    assert parse_args("0") == (0,)
+    assert parse_args('"ALL"') == ("ALL",)
+    assert parse_args("[1, 2, 3, 4]") == ([1, 2, 3, 4],)
+
+
+def test_multiple_args(parse_args):
+    assert parse_args('0, "ALL", 1.5') == (0, "ALL", 1.5)
+
+
+def test_rejects_non_literals(parse_args):
+    with pytest.raises(ValueError):
+        parse_args("__import__('os').system('echo pwned')")
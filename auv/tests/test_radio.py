@@ -0,0 +1,101 @@
+# Radio line framing tests (pyserial is stubbed, no serial port needed)
+
+import os
+
+import pytest
+
+from conftest import load_module
+
+
+class FakeSerial:
+    """ Stands in for serial.Serial. Each read returns the next queued chunk. """
+
+    def __init__(self, port, **settings):
+        self.port = port
+        self.settings = settings
+        self.is_open = True
+        self.in_waiting = 0
+        self.chunks = []
+        self._read_fd, self._write_fd = os.pipe()  # Gives the selector a real fd to watch
+
+    def fileno(self):
+        return self._read_fd
+
+    def read(self, size):
+        return self.chunks.pop(0) if self.chunks else b''
+
+    def close(self):
+        if self.is_open:
+            os.close(self._read_fd)
+            os.close(self._write_fd)
+            self.is_open = False
+
+
+@pytest.fixture
+def radio_module(stub_module):
+    stub_module("serial", Serial=FakeSerial, SerialException=IOError,
+                PARITY_NONE='N', STOPBITS_ONE=1, EIGHTBITS=8)
+    return load_module("radio", "api/radio.py")
+
+
+@pytest.fixture
+def make_radio(radio_module):
+    """ Returns a function that opens a Radio whose reads return the given chunks. """
+    radios = []
+
+    def make(chunks):
+        radio = radio_module.Radio("/dev/ttyUSB0", timeout=0.5)
+        radio.ser.chunks = list(chunks)
+        radios.append(radio)
+        return radio
+    yield make
+
+    for radio in radios:
+        radio.close()
+
+
+def test_drain_lines_returns_complete_lines(make_radio):
+    radio = make_radio([b'PING\nstart_mission(0)\n'])
+
+    assert radio.drain_lines() == [b'PING\n', b'start_mission(0)\n']
+    assert radio.rx_buffer == b''
+
+
+def test_drain_lines_keeps_partial_line_across_calls(make_radio):
+    radio = make_radio([b'PI', b'NG\nabort_', b'mission()\n'])
+
+    assert radio.drain_lines() == []
+    assert radio.drain_lines() == [b'PING\n']
+    assert radio.rx_buffer == b'abort_'
+    assert radio.drain_lines() == [b'abort_mission()\n']
+
+
+def test_drain_lines_returns_nothing_on_timeout(make_radio):
+    radio = make_radio([])
+
+    assert radio.drain_lines() == []
+
+
+def test_drain_lines_splits_on_newline_only(make_radio):
+    radio = make_radio([b'test_motor("A\rB")\n\n'])
+
+    assert radio.drain_lines() == [b'test_motor("A\rB")\n', b'\n']
+
+
+def test_drain_lines_drops_noise_longer_than_a_line(make_radio, radio_module):
+    noise = b'\xff' * (radio_module.MAX_LINE_LENGTH // 2 + 1)
+    radio = make_radio([noise, noise, b'PING\n'])
+
+    assert radio.drain_lines() == []
+    assert radio.drain_lines() == []
+    assert radio.rx_buffer == b''
+    assert radio.drain_lines() == [b'PING\n']
+
+
+def test_wait_readable(make_radio):
+    radio = make_radio([])
+
+    assert radio.wait_readable(0) is False
+    os.write(radio.ser._write_fd, b'PING\n')
+    assert radio.wait_readable(0.5) is True
+